@@ -4,18 +4,75 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Optional
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Optional, Union
 from contextlib import AsyncExitStack
+from pathlib import Path
 
+import httpx
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.session import ProgressFnT
+from mcp.types import CallToolResult, InitializeResult, TextContent, Tool
+
+from . import _json, schema_cache
+
+__all__ = ["MCPClient"]
 
 logger = logging.getLogger(__name__)
 
+# Tools with side effects must always reach the server
+_UNCACHEABLE_TOOLS = frozenset({"publish_post", "create_and_publish_post"})
+
+_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60.0)
+
+
+def _create_http_client(
+    headers: Optional[dict[str, str]] = None,
+    timeout: Optional[httpx.Timeout] = None,
+    auth: Optional[httpx.Auth] = None,
+) -> httpx.AsyncClient:
+    """Build the httpx client used by the SSE and streamable HTTP transports.
+
+    The transport keeps this client for the lifetime of the connection, so
+    every request reuses its keep-alive connection pool.
+    Redirects are left to the SDK, which only follows same-origin ones.
+    """
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout or httpx.Timeout(30.0, read=300.0),
+        auth=auth,
+        limits=_HTTP_LIMITS,
+    )
+
 
 class MCPClient:
-    """MCP client to call tools on the MCP server via stdio or SSE."""
+    """MCP client to call tools on the MCP server via stdio, SSE or streamable HTTP."""
+
+    __slots__ = (
+        "transport",
+        "host",
+        "port",
+        "command",
+        "timeout",
+        "tools_ttl",
+        "cache_ttl",
+        "cache_size",
+        "schema_cache_path",
+        "schema_cache_ttl",
+        "server_version",
+        "base_url",
+        "_session",
+        "_owner",
+        "_closing",
+        "_connect_lock",
+        "_tools_by_name",
+        "_tools_fetched_at",
+        "_result_cache",
+    )
 
     def __init__(
         self,
@@ -24,15 +81,35 @@ class MCPClient:
         port: int = 8002,
         command: Optional[str] = None,
         timeout: float = 30.0,
+        tools_ttl: float = 300.0,
+        cache_ttl: float = 0.0,
+        cache_size: int = 128,
+        schema_cache_path: Optional[Path] = None,
+        schema_cache_ttl: float = 86400.0,
     ) -> None:
         self.transport = transport
         self.host = host
         self.port = port
         self.command = command
         self.timeout = timeout
-        self.base_url = f"http://{host}:{port}/sse"  # For SSE
+        self.tools_ttl = tools_ttl
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.schema_cache_path = schema_cache_path
+        self.schema_cache_ttl = schema_cache_ttl
+        self.server_version: Optional[str] = None
+        # For SSE / streamable HTTP
+        if transport == "streamable-http":
+            self.base_url = f"http://{host}:{port}/mcp"
+        else:
+            self.base_url = f"http://{host}:{port}/sse"
         self._session: Optional[ClientSession] = None
-        self._exit_stack: Optional[AsyncExitStack] = None
+        self._owner: Optional[asyncio.Task[None]] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._connect_lock = asyncio.Lock()
+        self._tools_by_name: dict[str, Tool] = {}
+        self._tools_fetched_at: Optional[float] = None
+        self._result_cache: OrderedDict[tuple[str, bytes], tuple[float, CallToolResult]] = OrderedDict()
 
     async def __aenter__(self) -> "MCPClient":
         await self.connect()
@@ -42,12 +119,61 @@ class MCPClient:
         await self.close()
 
     async def connect(self) -> None:
-        """Establish connection to the MCP server."""
+        """Establish connection to the MCP server.
+
+        The transport and session are opened and later closed by one owner
+        task. The SDK's anyio task groups must be exited by the task that
+        entered them, and connect() and close() are called from different
+        tasks (first tool call, keepalive, cleanup).
+        """
         if self._session is not None:
             return
-        
-        self._exit_stack = AsyncExitStack()
-        
+        # Concurrent reconnects (acquire, gathered tool calls) must not each
+        # start a session and orphan all but the last
+        async with self._connect_lock:
+            if self._session is not None:
+                return
+
+            ready: asyncio.Future[InitializeResult] = asyncio.get_running_loop().create_future()
+            self._closing = asyncio.Event()
+            self._owner = asyncio.create_task(
+                self._own_session(ready, self._closing), name=f"mcp-session-{self.transport}"
+            )
+            init_result = await ready
+            try:
+                await self._load_tools(init_result.serverInfo.version)
+            except BaseException:
+                await self.close()
+                raise
+
+    async def _own_session(
+        self, ready: asyncio.Future[InitializeResult], closing: asyncio.Event
+    ) -> None:
+        """Hold the session open until ``closing`` is set, then tear it down."""
+        try:
+            async with AsyncExitStack() as stack:
+                self._session, init_result = await self._open_session(stack)
+                ready.set_result(init_result)
+                await closing.wait()
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+            raise
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("MCP session ended: %s", e)
+        finally:
+            # close() has already detached us if this was a requested shutdown
+            if self._owner is asyncio.current_task():
+                self._owner = None
+                self._session = None
+
+    async def _open_session(
+        self, stack: AsyncExitStack
+    ) -> tuple[ClientSession, InitializeResult]:
+        """Open the transport and an initialized session on ``stack``."""
         if self.transport == "stdio":
             # Use stdio transport - spawn server as subprocess
             if not self.command:
@@ -65,84 +191,325 @@ class MCPClient:
                 env=None
             )
             
-            stdio_transport = await self._exit_stack.enter_async_context(
-                stdio_client(server_params)
-            )
+            stdio_transport = await stack.enter_async_context(stdio_client(server_params))
             
-            self._session = await self._exit_stack.enter_async_context(
+            session = await stack.enter_async_context(
                 ClientSession(stdio_transport[0], stdio_transport[1])
             )
             
-            await self._session.initialize()
+            init_result = await session.initialize()
             logger.info("MCP client connected via stdio and initialized")
             
         elif self.transport == "sse":
             # Use SSE transport - connect to existing server
             logger.info("Connecting to MCP server at %s via SSE", self.base_url)
             
-            sse_transport = await self._exit_stack.enter_async_context(
-                sse_client(self.base_url)
+            sse_transport = await stack.enter_async_context(
+                sse_client(self.base_url, httpx_client_factory=_create_http_client)
             )
             
-            self._session = await self._exit_stack.enter_async_context(
+            session = await stack.enter_async_context(
                 ClientSession(sse_transport[0], sse_transport[1])
             )
             
-            await self._session.initialize()
+            init_result = await session.initialize()
             logger.info("MCP client connected via SSE and initialized")
+
+        elif self.transport == "streamable-http":
+            # Use streamable HTTP - one endpoint, responses come back on the
+            # same request instead of a separate SSE side channel
+            logger.info("Connecting to MCP server at %s via streamable HTTP", self.base_url)
+
+            read_stream, write_stream, _ = await stack.enter_async_context(
+                streamablehttp_client(self.base_url, httpx_client_factory=_create_http_client)
+            )
+
+            session = await stack.enter_async_context(ClientSession(read_stream, write_stream))
+
+            init_result = await session.initialize()
+            logger.info("MCP client connected via streamable HTTP and initialized")
         else:
             raise ValueError(f"Unsupported transport: {self.transport}")
+        return session, init_result
 
     async def close(self) -> None:
         """Close the MCP client connection."""
-        if self._exit_stack is not None:
-            await self._exit_stack.aclose()
-            self._exit_stack = None
-            self._session = None
-            logger.info("MCP client connection closed")
+        owner, self._owner = self._owner, None
+        if owner is None:
+            return
+        self._session = None
+        self._tools_by_name = {}
+        self._tools_fetched_at = None
+        self._result_cache.clear()
+        if self._closing is not None:
+            self._closing.set()
+        # The owner task exits the transport contexts it entered
+        await owner
+        logger.info("MCP client connection closed")
 
-    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]] = None) -> str:
-        """Call a tool on the MCP server."""
+    @property
+    def connected(self) -> bool:
+        return self._session is not None
+
+    async def ping(self) -> None:
+        """Send a lightweight ping to keep the connection alive."""
+        if self._session is None:
+            raise RuntimeError("MCP session is not connected")
+        await asyncio.wait_for(self._session.send_ping(), timeout=self.timeout)
+
+    async def refresh(self) -> None:
+        """Fetch the server's tool list and cache it by name.
+
+        Listing the tools also primes the session's output-schema cache, so
+        later ``call_tool`` invocations don't trigger their own ``list_tools``
+        round-trip.
+        """
+        if self._session is None:
+            raise RuntimeError("MCP session is not connected")
+
+        tools: dict[str, Tool] = {}
+        cursor: Optional[str] = None
+        while True:
+            result = await self._session.list_tools(cursor=cursor)
+            for tool in result.tools:
+                tools[tool.name] = tool
+            cursor = result.nextCursor
+            if not cursor:
+                break
+
+        self._tools_by_name = tools
+        self._tools_fetched_at = time.monotonic()
+        logger.info("Cached %d MCP tool definitions", len(tools))
+
+        if self.schema_cache_path is not None:
+            schema_cache.save_entry(
+                self.schema_cache_path,
+                self.schema_cache_key,
+                self.server_version,
+                [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools.values()],
+            )
+
+    @property
+    def schema_cache_key(self) -> str:
+        return schema_cache.cache_key(self.transport, self.host, self.port, self.command)
+
+    async def _load_tools(self, server_version: Optional[str]) -> None:
+        """Populate the tool cache, from disk when it matches the server version."""
+        self.server_version = server_version
+        entry = None
+        if self.schema_cache_path is not None:
+            entry = schema_cache.load_entry(
+                self.schema_cache_path, self.schema_cache_key, self.schema_cache_ttl
+            )
+        if entry is None or entry.get("server_version") != server_version:
+            await self.refresh()
+            return
+
+        tools = {t.name: t for t in (Tool.model_validate(d) for d in entry["tools"])}
+        self._tools_by_name = tools
+        self._tools_fetched_at = time.monotonic()
+        # Prime the session's output-schema cache too, otherwise it lists the
+        # tools itself on the first call to each one
+        output_schemas = getattr(self._session, "_tool_output_schemas", None)
+        if isinstance(output_schemas, dict):
+            for tool in tools.values():
+                output_schemas[tool.name] = tool.outputSchema
+        logger.info("Loaded %d MCP tool definitions from %s", len(tools), self.schema_cache_path)
+
+    def _tools_stale(self) -> bool:
+        return (
+            self._tools_fetched_at is None
+            or time.monotonic() - self._tools_fetched_at > self.tools_ttl
+        )
+
+    def get_tool(self, tool_name: str) -> Optional[Tool]:
+        """Return the cached definition of a server tool, if known."""
+        return self._tools_by_name.get(tool_name)
+
+    def has_tool(self, tool_name: str) -> bool:
+        """Check whether the server advertised a tool in its cached tool list."""
+        return tool_name in self._tools_by_name
+
+    async def _ensure_session(self) -> ClientSession:
         if self._session is None:
             logger.info("🔌 No session, connecting...")
             await self.connect()
         if self._session is None:
             raise RuntimeError("Failed to initialize MCP session")
+        if self._tools_stale():
+            await self.refresh()
+        return self._session
+
+    async def _call_with_deadline(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+        progress_callback: Optional[ProgressFnT] = None,
+    ) -> Any:
+        """Run the tool call, cancelling it once ``self.timeout`` has elapsed."""
+        # On 3.12+ wait_for runs the call in the caller's task (no extra Task)
+        return await asyncio.wait_for(
+            self._session.call_tool(
+                tool_name, arguments=arguments, progress_callback=progress_callback
+            ),
+            timeout=self.timeout,
+        )
+
+    @staticmethod
+    def _result_text(result: Any) -> str:
+        """Extract text content from a tool result."""
+        text_parts = [item.text for item in result.content if type(item) is TextContent]
+        if text_parts:
+            return '\n'.join(text_parts)
+        if result.content:
+            logger.debug("Tool result has no text content (%d items)", len(result.content))
+        return ""
 
-        arguments = arguments or {}
+    def _cache_key(self, tool_name: str, arguments: dict[str, Any]) -> Optional[tuple[str, bytes]]:
+        if self.cache_ttl <= 0 or tool_name in _UNCACHEABLE_TOOLS:
+            return None
+        # Canonical JSON also covers list/dict argument values
+        try:
+            return (tool_name, _json.dumps(arguments, sort_keys=True))
+        except TypeError:
+            return None
+
+    def _cache_get(self, key: tuple[str, bytes]) -> Optional[CallToolResult]:
+        entry = self._result_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self.cache_ttl:
+            del self._result_cache[key]
+            return None
+        self._result_cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: tuple[str, bytes], result: CallToolResult) -> None:
+        self._result_cache[key] = (time.monotonic(), result)
+        self._result_cache.move_to_end(key)
+        while len(self._result_cache) > self.cache_size:
+            self._result_cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """Drop all memoized tool results."""
+        self._result_cache.clear()
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]] = None) -> str:
+        """Call a tool on the MCP server.
+
+        With ``cache_ttl`` > 0, results of side-effect-free tools are memoized
+        for that many seconds, so repeating a call with identical arguments
+        skips the round-trip. Off by default: create_post drafts with an LLM
+        and a repeat request should produce a fresh draft.
+        """
+        return await self._call_tool(tool_name, arguments or {})
+
+    async def _call_tool(self, tool_name: str, arguments: dict[str, Any]) -> str:
+        return self._result_text(await self._call_tool_result(tool_name, arguments))
+
+    async def _call_tool_result(self, tool_name: str, arguments: dict[str, Any]) -> CallToolResult:
+        key = self._cache_key(tool_name, arguments)
+        if key is not None:
+            cached = self._cache_get(key)
+            if cached is not None:
+                logger.info("Using cached result for MCP tool '%s'", tool_name)
+                return cached
+
+        await self._ensure_session()
         logger.info("Calling MCP tool '%s' with args: %s", tool_name, arguments)
 
         try:
             logger.info("⏳ Sending tool call to MCP server...")
-            # Add timeout to prevent hanging
-            result = await asyncio.wait_for(
-                self._session.call_tool(tool_name, arguments=arguments),
-                timeout=self.timeout
-            )
+            result = await self._call_with_deadline(tool_name, arguments)
             logger.info("✅ Received response from MCP server")
-            
-            # Extract text content from the result
-            if result.content:
-                text_parts = [item.text for item in result.content if hasattr(item, 'text')]
-                return '\n'.join(text_parts) if text_parts else str(result.content)
-            return ""
+            if key is not None and not result.isError:
+                self._cache_put(key, result)
+            return result
         except asyncio.TimeoutError:
             error_msg = f"MCP tool '{tool_name}' timed out after {self.timeout}s"
             logger.error(error_msg)
             raise TimeoutError(error_msg)
         except Exception as e:
-            error_msg = f"MCP tool '{tool_name}' failed: {e}"
-            logger.error(error_msg)
+            logger.error("MCP tool '%s' failed: %s", tool_name, e)
             raise
 
+    async def call_tool_stream(
+        self, tool_name: str, arguments: Optional[dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Call a tool and yield text as it becomes available.
+
+        MCP tool results arrive in one piece, so this yields the progress
+        messages the server reports while the tool runs, then the final
+        result text.
+        """
+        async for chunk in self._stream_tool_result(tool_name, arguments or {}):
+            if isinstance(chunk, str):
+                yield chunk
+            elif text := self._result_text(chunk):
+                yield text
+
+    async def _stream_tool_result(
+        self, tool_name: str, arguments: dict[str, Any]
+    ) -> AsyncIterator[Union[str, CallToolResult]]:
+        """Yield progress messages, then the tool's final ``CallToolResult``."""
+        await self._ensure_session()
+
+        logger.info("Streaming MCP tool '%s' with args: %s", tool_name, arguments)
+
+        queue: asyncio.Queue[Optional[str]] = asyncio.Queue()
+
+        async def on_progress(progress: float, total: Optional[float], message: Optional[str]) -> None:
+            if message:
+                queue.put_nowait(message)
+
+        task = asyncio.ensure_future(self._call_with_deadline(tool_name, arguments, on_progress))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+            try:
+                result = task.result()
+            except asyncio.TimeoutError:
+                error_msg = f"MCP tool '{tool_name}' timed out after {self.timeout}s"
+                logger.error(error_msg)
+                raise TimeoutError(error_msg)
+            yield result
+        finally:
+            if not task.done():
+                task.cancel()
+
     async def create_post(
         self,
         text: str,
         style: str = "professional",
         include_hashtags: bool = True,
         max_length: int = 280,
-    ) -> str:
-        return await self.call_tool(
+    ) -> dict[str, Optional[str]]:
+        """Draft a post.
+
+        Returns the rendered tool output under ``"rendered"`` and the bare
+        post text under ``"post_text"``. The post text comes from the
+        result's structured content and is ``None`` when the server
+        doesn't provide it.
+        """
+        arguments = {
+            "text": text,
+            "style": style,
+            "include_hashtags": include_hashtags,
+            "max_length": max_length,
+        }
+        return self._draft_result(await self._call_tool_result("create_post", arguments))
+
+    async def create_post_stream(
+        self,
+        text: str,
+        style: str = "professional",
+        include_hashtags: bool = True,
+        max_length: int = 280,
+    ) -> AsyncIterator[Union[str, dict[str, Optional[str]]]]:
+        """Yield progress messages, then the draft in ``create_post``'s shape."""
+        async for chunk in self._stream_tool_result(
             "create_post",
             {
                 "text": text,
@@ -150,7 +517,17 @@ class MCPClient:
                 "include_hashtags": include_hashtags,
                 "max_length": max_length,
             },
-        )
+        ):
+            yield chunk if isinstance(chunk, str) else self._draft_result(chunk)
+
+    @classmethod
+    def _draft_result(cls, result: CallToolResult) -> dict[str, Optional[str]]:
+        structured = result.structuredContent or {}
+        post_text = structured.get("post_text")
+        return {
+            "rendered": cls._result_text(result),
+            "post_text": post_text if isinstance(post_text, str) else None,
+        }
 
     async def publish_post(self, post_text: str, confirm: bool = False) -> str:
         return await self.call_tool(
@@ -160,3 +537,27 @@ class MCPClient:
                 "confirm": confirm,
             },
         )
+
+    async def create_and_publish_post(
+        self,
+        text: str,
+        style: str = "professional",
+        include_hashtags: bool = True,
+        max_length: int = 280,
+        confirm: bool = False,
+    ) -> str:
+        """Draft and publish a post in a single round-trip.
+
+        Only available when the server advertises ``create_and_publish_post``;
+        check with ``has_tool`` first.
+        """
+        return await self.call_tool(
+            "create_and_publish_post",
+            {
+                "text": text,
+                "style": style,
+                "include_hashtags": include_hashtags,
+                "max_length": max_length,
+                "confirm": confirm,
+            },
+        )
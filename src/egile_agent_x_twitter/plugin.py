@@ -2,19 +2,178 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
-from typing import Any, Optional
+from pathlib import Path
+from time import localtime, strftime
+from typing import Any, AsyncIterator, Optional
 
 from egile_agent_core.plugins import Plugin
+from . import _json, schema_cache
 from .mcp_client import MCPClient
+from .pool import MCPClientPool, get_pool, release_pool
 
 logger = logging.getLogger(__name__)
 
+_STYLE_EMOJI = {
+    "professional": "📢 ",
+    "casual": "👋 ",
+    "witty": "😄 ",
+    "inspirational": "✨ ",
+}
+
+_DASHES = "-" * 60
+_PT_HEADER = f"POST TEXT:\n{_DASHES}\n"
+_PT_FOOTER = f"\n{_DASHES}\n"
+_POST_TEXT_RE = re.compile(r"POST TEXT:\s*\n-+\n(.+?)\n-+\n", re.DOTALL)
+
+_DRY_RUN_TEMPLATE = (
+    "⚠️ DRY RUN MODE\n\n"
+    "This post is ready to publish:\n\n{text}\n\n"
+    "To actually publish, call this tool again with confirm=True"
+)
+
+
+# Tool descriptions for LLM function-calling interfaces; built once at import
+_TOOLS_SPEC: tuple[dict[str, Any], ...] = (
+    {
+        "type": "function",
+        "function": {
+            "name": "create_post",
+            "description": "Create an attractive X/Twitter post from input text.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "text": {
+                        "type": "string",
+                        "description": "Input text to transform into a post",
+                    },
+                    "post_text": {
+                        "type": "string",
+                        "description": "Alias for text; the content to transform into a post",
+                    },
+                    "style": {
+                        "type": "string",
+                        "enum": [
+                            "professional",
+                            "casual",
+                            "witty",
+                            "inspirational",
+                        ],
+                        "description": "Writing style",
+                        "default": "professional",
+                    },
+                    "include_hashtags": {
+                        "type": "boolean",
+                        "description": "Include relevant hashtags",
+                        "default": True,
+                    },
+                    "max_length": {
+                        "type": "integer",
+                        "description": "Max characters (default 280)",
+                        "default": 280,
+                    },
+                },
+                "required": [],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "create_posts",
+            "description": "Create several X/Twitter post drafts at once, one per item.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "description": "Drafts to create; each item takes the create_post arguments",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "text": {"type": "string"},
+                                "style": {
+                                    "type": "string",
+                                    "enum": [
+                                        "professional",
+                                        "casual",
+                                        "witty",
+                                        "inspirational",
+                                    ],
+                                },
+                                "include_hashtags": {"type": "boolean"},
+                                "max_length": {"type": "integer"},
+                            },
+                            "required": ["text"],
+                        },
+                    },
+                },
+                "required": ["items"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "publish_post",
+            "description": "Publish a post to X/Twitter. Defaults to the latest cached draft if post_text is omitted. Always set confirm=True to actually publish.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "post_text": {
+                        "type": "string",
+                        "description": "The full post text to publish (optional if a draft was just created)",
+                    },
+                    "confirm": {
+                        "type": "boolean",
+                        "description": "Must be true to publish (safety)",
+                        "default": False,
+                    },
+                },
+                "required": [],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_last_draft",
+            "description": "Return the most recent created draft text (empty string if none).",
+            "parameters": {"type": "object", "properties": {}, "required": []},
+        },
+    },
+)
+
+# Compact JSON of the same, for transports that can forward bytes as-is
+_TOOLS_JSON: bytes = _json.dumps(list(_TOOLS_SPEC))
+
 
 class XTwitterPlugin(Plugin):
     """Plugin that creates and publishes X/Twitter posts via MCP."""
 
+    # Only drops the per-instance __dict__ if the Plugin base is slotted too
+    __slots__ = (
+        "mcp_host",
+        "mcp_port",
+        "mcp_transport",
+        "mcp_command",
+        "timeout",
+        "use_mcp",
+        "cache_ttl",
+        "schema_cache_ttl",
+        "_schema_cache_path",
+        "_lazy_connect",
+        "_client",
+        "_pool",
+        "_init_lock",
+        "_ready",
+        "_agent",
+        "_last_draft_text",
+        "_tool_functions",
+    )
+
     def __init__(
         self,
         mcp_host: str = "localhost",
@@ -23,6 +182,9 @@ class XTwitterPlugin(Plugin):
         mcp_command: Optional[str] = None,
         timeout: float = 30.0,
         use_mcp: bool = True,
+        cache_ttl: float = 0.0,
+        schema_cache_path: Optional[Path] = None,
+        schema_cache_ttl: float = 86400.0,
     ) -> None:
         self.mcp_host = mcp_host
         self.mcp_port = mcp_port
@@ -30,9 +192,24 @@ class XTwitterPlugin(Plugin):
         self.mcp_command = mcp_command or "python -m egile_mcp_x_post_creator.server"
         self.timeout = timeout
         self.use_mcp = use_mcp
+        # Drafts are generated by an LLM, so repeat requests should get a new one
+        self.cache_ttl = cache_ttl
+        self.schema_cache_ttl = schema_cache_ttl
+        self._schema_cache_path = schema_cache_path or schema_cache.DEFAULT_PATH
+        self._lazy_connect = False
         self._client: Optional[MCPClient] = None
+        self._pool: Optional[MCPClientPool] = None
+        self._init_lock = asyncio.Lock()
+        self._ready = asyncio.Event()
         self._agent = None
         self._last_draft_text: Optional[str] = None
+        # Bound once; the agent loop looks tools up here on every invocation
+        self._tool_functions: dict[str, Any] = {
+            "create_post": self.create_post,
+            "create_posts": self.create_posts,
+            "publish_post": self.publish_post,
+            "get_last_draft": self.get_last_draft,
+        }
 
     @property
     def name(self) -> str:
@@ -59,23 +236,71 @@ class XTwitterPlugin(Plugin):
         self._agent = agent
         
         if self.use_mcp:
-            self._client = MCPClient(
-                transport=self.mcp_transport,
-                host=self.mcp_host,
-                port=self.mcp_port,
-                command=self.mcp_command,
-                timeout=self.timeout,
+            key = schema_cache.cache_key(
+                self.mcp_transport, self.mcp_host, self.mcp_port, self.mcp_command
             )
-            await self._client.connect()
-            logger.info(f"XTwitter plugin connected to MCP server via {self.mcp_transport}")
+            if schema_cache.load_entry(self._schema_cache_path, key, self.schema_cache_ttl):
+                # Known server: defer the handshake to the first tool call
+                self._lazy_connect = True
+                logger.info("XTwitter plugin will connect to MCP server on first use")
+                return
+            await self._ensure_client()
+            logger.info("XTwitter plugin connected to MCP server via %s", self.mcp_transport)
         else:
             logger.info("XTwitter plugin initialized in direct mode (no MCP)")
 
+    async def _ensure_client(self) -> Optional[MCPClient]:
+        """Acquire a pooled MCP client, reusing a warm session when available.
+
+        Safe to call concurrently: only the first caller connects, the others
+        wait for it and reuse its client.
+        """
+        if self._ready.is_set() or not self.use_mcp:
+            return self._client
+        async with self._init_lock:
+            if not self._ready.is_set():
+                pool = get_pool(
+                    transport=self.mcp_transport,
+                    host=self.mcp_host,
+                    port=self.mcp_port,
+                    command=self.mcp_command,
+                    timeout=self.timeout,
+                    cache_ttl=self.cache_ttl,
+                    schema_cache_path=self._schema_cache_path,
+                    schema_cache_ttl=self.schema_cache_ttl,
+                )
+                try:
+                    self._client = await pool.acquire()
+                except BaseException:
+                    # Don't leak the reference; a retry takes a fresh one
+                    await release_pool(pool)
+                    raise
+                self._pool = pool
+                self._lazy_connect = False
+                self._ready.set()
+        return self._client
+
+    async def _connect_if_lazy(self) -> None:
+        """Open the deferred MCP connection on the first real tool call."""
+        if self._lazy_connect:
+            await self._ensure_client()
+
     async def cleanup(self) -> None:
-        """Close MCP client."""
-        if self._client:
-            await self._client.close()
-            self._client = None
+        """Release the MCP client and this plugin's reference on the pool."""
+        client, self._client = self._client, None
+        pool, self._pool = self._pool, None
+        self._lazy_connect = False
+        self._ready.clear()
+        try:
+            if client:
+                if pool is not None:
+                    await pool.release(client)
+                else:
+                    await client.close()
+        finally:
+            if pool is not None:
+                # Closes the shared sessions once the last plugin lets go
+                await release_pool(pool)
 
     async def create_post(
         self,
@@ -85,10 +310,23 @@ class XTwitterPlugin(Plugin):
         include_hashtags: bool = True,
         max_length: int = 280,
     ) -> str:
+        """Draft a post."""
         effective_text = text or post_text
         if not effective_text:
             return "No text provided. Pass either 'text' or 'post_text' with the content to draft."
         
+        rendered, _ = await self._draft(effective_text, style, include_hashtags, max_length)
+        return rendered
+
+    async def _draft(
+        self,
+        effective_text: str,
+        style: str,
+        include_hashtags: bool,
+        max_length: int,
+    ) -> tuple[str, Optional[str]]:
+        """Draft a post; return the rendered output and the extracted post text."""
+        await self._connect_if_lazy()
         if self.use_mcp and self._client:
             # Use MCP mode
             result = await self._client.create_post(
@@ -101,35 +339,90 @@ class XTwitterPlugin(Plugin):
             # Direct mode - simple formatting
             result = self._create_post_direct(effective_text, style, include_hashtags, max_length)
 
-        # Try to cache the post text for later publish calls
-        cached = self._extract_post_text(str(result))
+        return self._remember_draft(result)
+
+    def _remember_draft(self, result: Any) -> tuple[str, Optional[str]]:
+        """Cache the post text of a draft for later publish calls.
+
+        Returns the rendered draft and the extracted post text.
+        """
+        if isinstance(result, dict):
+            cached = result.get("post_text") or self._extract_post_text(result["rendered"])
+            result = result["rendered"]
+        elif isinstance(result, str):
+            cached = self._extract_post_text(result)
+        else:
+            result = str(result)
+            cached = self._extract_post_text(result)
         if cached:
             self._last_draft_text = cached
-
-        return result
+        return result, cached
     
+    async def create_post_stream(
+        self,
+        text: str = "",
+        post_text: str = "",
+        style: str = "professional",
+        include_hashtags: bool = True,
+        max_length: int = 280,
+    ) -> AsyncIterator[str]:
+        """Like create_post, but yield output as it arrives from the MCP server."""
+        effective_text = text or post_text
+        if not effective_text:
+            yield "No text provided. Pass either 'text' or 'post_text' with the content to draft."
+            return
+
+        await self._connect_if_lazy()
+        if self.use_mcp and self._client:
+            # Progress messages come through as str; the draft itself in
+            # create_post's result shape
+            async for chunk in self._client.create_post_stream(
+                text=effective_text,
+                style=style,
+                include_hashtags=include_hashtags,
+                max_length=max_length,
+            ):
+                if isinstance(chunk, dict):
+                    chunk, _ = self._remember_draft(chunk)
+                yield chunk
+        else:
+            rendered, _ = self._remember_draft(
+                self._create_post_direct(effective_text, style, include_hashtags, max_length)
+            )
+            yield rendered
+
+    async def create_posts(self, items: list[dict[str, Any]]) -> list[str]:
+        """Create several drafts concurrently.
+
+        Each item takes the same keyword arguments as create_post. The MCP
+        session multiplexes requests, so the drafts are in flight together and
+        the whole set takes about as long as its slowest draft.
+        """
+        if not items:
+            return []
+        return list(await asyncio.gather(*(self.create_post(**item) for item in items)))
+
     def _create_post_direct(self, text: str, style: str, include_hashtags: bool, max_length: int) -> str:
         """Create a post using simple direct formatting (no LLM)."""
         # Simple formatting based on style
-        if style == "casual":
-            emoji = "👋 "
-        elif style == "witty":
-            emoji = "😄 "
-        elif style == "inspirational":
-            emoji = "✨ "
-        else:
-            emoji = "📢 "
+        emoji = _STYLE_EMOJI.get(style, _STYLE_EMOJI["professional"])
         
         # Format the post
         post = f"{emoji}{text}"
         
-        # Add hashtags if requested
+        # Add hashtags if requested and they fit; a truncated post would cut them off anyway
         if include_hashtags:
-            # Extract keywords for hashtags (simple approach)
-            words = text.split()
-            hashtags = [f"#{word.capitalize()}" for word in words if len(word) > 4][:2]
+            # First two long words become hashtags (simple approach)
+            hashtags = []
+            for word in text.split():
+                if len(word) > 4:
+                    hashtags.append("#" + word.capitalize())
+                    if len(hashtags) == 2:
+                        break
             if hashtags:
-                post += f"\n\n{' '.join(hashtags)}"
+                suffix = f"\n\n{' '.join(hashtags)}"
+                if len(post) + len(suffix) <= max_length:
+                    post += suffix
         
         # Truncate if needed
         if len(post) > max_length:
@@ -139,24 +432,21 @@ class XTwitterPlugin(Plugin):
         stats = {
             "character_count": len(post),
             "hashtag_count": post.count('#'),
-            "emoji_count": len([c for c in post if ord(c) > 127000]),
         }
         
-        output = f"✅ Post Created Successfully!\n\n"
-        output += f"📝 POST TEXT:\n{'-' * 60}\n"
-        output += f"{post}\n"
-        output += f"{'-' * 60}\n\n"
-        output += f"📊 STATISTICS:\n"
-        output += f"  • Characters: {stats['character_count']}/{max_length}\n"
-        output += f"  • Hashtags: {stats['hashtag_count']}\n"
-        output += f"  • Style: {style}\n\n"
-        output += f"💡 TIP: To publish this post, use the publish_post tool with confirm=True\n"
-        
-        return output
+        return (
+            "✅ Post Created Successfully!\n\n"
+            f"📝 POST TEXT:\n{_DASHES}\n"
+            f"{post}\n"
+            f"{_DASHES}\n\n"
+            "📊 STATISTICS:\n"
+            f"  • Characters: {stats['character_count']}/{max_length}\n"
+            f"  • Hashtags: {stats['hashtag_count']}\n"
+            f"  • Style: {style}\n\n"
+            "💡 TIP: To publish this post, use the publish_post tool with confirm=True\n"
+        )
 
     async def publish_post(self, post_text: str = "", confirm: bool = False) -> str:
-        logger.info(f"🚀 publish_post called! post_text length: {len(post_text) if post_text else 0}, confirm: {confirm}")
-        
         # Use cached draft if no post_text provided
         effective_post_text = post_text or self._last_draft_text
         if not effective_post_text:
@@ -164,14 +454,17 @@ class XTwitterPlugin(Plugin):
                 "No post_text provided and no cached draft found. Please pass the exact post text to publish "
                 "(e.g., the latest draft you just created). The MCP server is stateless, so include the full post_text in this call."
             )
+
+        logger.info(
+            "🚀 publish_post called! post_text length: %d, confirm: %s",
+            len(post_text) if post_text else 0,
+            confirm,
+        )
         
         if not confirm:
-            return (
-                f"⚠️ DRY RUN MODE\n\n"
-                f"This post is ready to publish:\n\n{effective_post_text}\n\n"
-                f"To actually publish, call this tool again with confirm=True"
-            )
+            return _DRY_RUN_TEMPLATE.format(text=effective_post_text)
         
+        await self._connect_if_lazy()
         if self.use_mcp and self._client:
             # Use MCP mode
             result = await self._client.publish_post(post_text=effective_post_text, confirm=True)
@@ -179,27 +472,76 @@ class XTwitterPlugin(Plugin):
             # Direct mode - simulate publishing
             result = self._publish_post_direct(effective_post_text)
         
-        logger.info(f"📝 publish_post result: {result[:200] if result else 'None'}")
+        # %.200s truncates only when the record is actually emitted
+        logger.info("📝 publish_post result: %.200s", result or "None")
         return result
     
+    async def create_and_publish_post(
+        self,
+        text: str = "",
+        post_text: str = "",
+        style: str = "professional",
+        include_hashtags: bool = True,
+        max_length: int = 280,
+        confirm: bool = False,
+    ) -> str:
+        """Draft a post and publish it straight away when confirm=True.
+
+        Python API only: it is not offered to the LLM as a tool, because the
+        agent must show the draft to the user before anything is published.
+
+        Uses the server's compound tool when available so drafting and
+        publishing cost a single round-trip; otherwise falls back to
+        create_post followed by publish_post.
+        """
+        effective_text = text or post_text
+        if not effective_text:
+            return "No text provided. Pass either 'text' or 'post_text' with the content to draft."
+
+        if not confirm:
+            # Without confirmation this is just a draft
+            return await self.create_post(
+                text=effective_text,
+                style=style,
+                include_hashtags=include_hashtags,
+                max_length=max_length,
+            )
+
+        await self._connect_if_lazy()
+        if self.use_mcp and self._client and self._client.has_tool("create_and_publish_post"):
+            result = await self._client.create_and_publish_post(
+                text=effective_text,
+                style=style,
+                include_hashtags=include_hashtags,
+                max_length=max_length,
+                confirm=True,
+            )
+            cached = self._extract_post_text(result)
+            if cached:
+                self._last_draft_text = cached
+            return result
+
+        draft, draft_text = await self._draft(effective_text, style, include_hashtags, max_length)
+        if not draft_text:
+            return f"{draft}\n\nCould not extract the draft text, so nothing was published."
+        return await self.publish_post(post_text=draft_text, confirm=True)
+
     def _publish_post_direct(self, text: str) -> str:
         """Simulate publishing a post (no actual X API call)."""
-        import datetime
-        
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        output = f"🚀 Post Published Successfully!\n\n"
-        output += f"📝 PUBLISHED TEXT:\n{'-' * 60}\n"
-        output += f"{text}\n"
-        output += f"{'-' * 60}\n\n"
-        output += f"📊 DETAILS:\n"
-        output += f"  • Published At: {timestamp}\n"
-        output += f"  • Character Count: {len(text)}\n"
-        output += f"  • Status: Success (simulated)\n\n"
-        output += f"⚠️ NOTE: This is a simulated publish. To publish to actual X/Twitter,\n"
-        output += f"configure the X API credentials in the MCP server and use MCP mode.\n"
+        timestamp = strftime("%Y-%m-%d %H:%M:%S", localtime())
         
-        return output
+        return (
+            "🚀 Post Published Successfully!\n\n"
+            f"📝 PUBLISHED TEXT:\n{_DASHES}\n"
+            f"{text}\n"
+            f"{_DASHES}\n\n"
+            "📊 DETAILS:\n"
+            f"  • Published At: {timestamp}\n"
+            f"  • Character Count: {len(text)}\n"
+            "  • Status: Success (simulated)\n\n"
+            "⚠️ NOTE: This is a simulated publish. To publish to actual X/Twitter,\n"
+            "configure the X API credentials in the MCP server and use MCP mode.\n"
+        )
 
     async def get_last_draft(self) -> str:
         """Return the most recent cached draft text, if any."""
@@ -208,91 +550,24 @@ class XTwitterPlugin(Plugin):
     @staticmethod
     def _extract_post_text(output: str) -> Optional[str]:
         """Extract the post text block from the create_post output."""
-        match = re.search(r"POST TEXT:\s*\n[-]+\n(.+?)\n[-]+\n", output, re.DOTALL)
-        if match:
-            return match.group(1).strip()
-        return None
+        # Fast path: the fixed delimiters both MCP and direct mode render
+        i = output.find(_PT_HEADER)
+        if i >= 0:
+            i += len(_PT_HEADER)
+            j = output.find(_PT_FOOTER, i)
+            if j >= 0:
+                return output[i:j].strip()
+
+        match = _POST_TEXT_RE.search(output)
+        return match.group(1).strip() if match else None
 
     def get_tools(self) -> list[dict[str, Any]]:
         """Describe tools for LLM function-calling interfaces."""
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "create_post",
-                    "description": "Create an attractive X/Twitter post from input text.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "text": {
-                                "type": "string",
-                                "description": "Input text to transform into a post",
-                            },
-                            "post_text": {
-                                "type": "string",
-                                "description": "Alias for text; the content to transform into a post",
-                            },
-                            "style": {
-                                "type": "string",
-                                "enum": [
-                                    "professional",
-                                    "casual",
-                                    "witty",
-                                    "inspirational",
-                                ],
-                                "description": "Writing style",
-                                "default": "professional",
-                            },
-                            "include_hashtags": {
-                                "type": "boolean",
-                                "description": "Include relevant hashtags",
-                                "default": True,
-                            },
-                            "max_length": {
-                                "type": "integer",
-                                "description": "Max characters (default 280)",
-                                "default": 280,
-                            },
-                        },
-                        "required": [],
-                    },
-                },
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "publish_post",
-                    "description": "Publish a post to X/Twitter. Defaults to the latest cached draft if post_text is omitted. Always set confirm=True to actually publish.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "post_text": {
-                                "type": "string",
-                                "description": "The full post text to publish (optional if a draft was just created)",
-                            },
-                            "confirm": {
-                                "type": "boolean",
-                                "description": "Must be true to publish (safety)",
-                                "default": False,
-                            },
-                        },
-                        "required": [],
-                    },
-                },
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_last_draft",
-                    "description": "Return the most recent created draft text (empty string if none).",
-                    "parameters": {"type": "object", "properties": {}, "required": []},
-                },
-            },
-        ]
+        return list(_TOOLS_SPEC)
+
+    def get_tools_json(self) -> bytes:
+        """Return ``get_tools()`` pre-serialized as compact UTF-8 JSON."""
+        return _TOOLS_JSON
 
     def get_tool_functions(self) -> dict[str, Any]:
-        return {
-            "create_post": self.create_post,
-            "publish_post": self.publish_post,
-            "get_last_draft": self.get_last_draft,
-        }
+        return self._tool_functions
@@ -0,0 +1,166 @@
+"""Pool of long-lived MCP client sessions."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+from .mcp_client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+
+class MCPClientPool:
+    """Keep up to ``size`` warm MCP sessions and hand them out round-robin.
+
+    MCP sessions multiplex requests by id, so a client handed out by the pool
+    can be shared by several callers at once; the pool only bounds how many
+    connections (and initialize handshakes) are made to one server. The
+    default of one session means every plugin on a server shares a single
+    connection, and a single subprocess for stdio.
+    """
+
+    __slots__ = (
+        "size",
+        "keepalive_interval",
+        "_client_kwargs",
+        "_clients",
+        "_queue",
+        "_lock",
+        "_keepalive_task",
+        "_users",
+    )
+
+    def __init__(
+        self,
+        size: int = 1,
+        keepalive_interval: float = 30.0,
+        **client_kwargs: Any,
+    ) -> None:
+        self.size = size
+        self.keepalive_interval = keepalive_interval
+        self._client_kwargs = client_kwargs
+        self._clients: list[MCPClient] = []
+        self._queue: asyncio.Queue[MCPClient] = asyncio.Queue()
+        self._lock = asyncio.Lock()
+        self._keepalive_task: Optional[asyncio.Task[None]] = None
+        self._users = 0
+
+    async def acquire(self) -> MCPClient:
+        """Return a connected client, opening a new session while below ``size``."""
+        async with self._lock:
+            if len(self._clients) < self.size:
+                client = MCPClient(**self._client_kwargs)
+                await client.connect()
+                self._clients.append(client)
+            else:
+                client = self._queue.get_nowait()
+            # Put it straight back at the tail: clients are shared, not leased
+            self._queue.put_nowait(client)
+            self._start_keepalive()
+
+        if not client.connected:
+            await client.connect()
+        return client
+
+    async def release(self, client: MCPClient) -> None:
+        """Hand a client back; broken clients are dropped from the rotation."""
+        if client.connected or client not in self._clients:
+            return
+        async with self._lock:
+            self._drop(client)
+
+    async def close(self) -> None:
+        """Stop the keepalive task and close every pooled session."""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        async with self._lock:
+            clients, self._clients = self._clients, []
+            self._queue = asyncio.Queue()
+        for client in clients:
+            await client.close()
+
+    def _drop(self, client: MCPClient) -> None:
+        self._clients.remove(client)
+        remaining = [c for c in self._drain_queue() if c is not client]
+        for c in remaining:
+            self._queue.put_nowait(c)
+
+    def _drain_queue(self) -> list[MCPClient]:
+        items = []
+        while not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        return items
+
+    def _start_keepalive(self) -> None:
+        if self.keepalive_interval <= 0:
+            return
+        if self._keepalive_task is None or self._keepalive_task.done():
+            self._keepalive_task = asyncio.create_task(self._keepalive())
+
+    async def _keepalive(self) -> None:
+        """Periodically ping idle sessions so SSE streams aren't dropped.
+
+        A session that fails its ping is closed, which marks the client as
+        disconnected; its next tool call (or ``acquire``) reconnects it.
+        """
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            for client in list(self._clients):
+                if not client.connected:
+                    continue
+                try:
+                    await client.ping()
+                except Exception as e:
+                    logger.warning("MCP keepalive ping failed, closing session: %r", e)
+                    try:
+                        await client.close()
+                    except Exception as e:
+                        logger.error("Closing broken MCP session failed: %s", e)
+
+
+_POOLS: dict[tuple[Any, ...], MCPClientPool] = {}
+
+
+def get_pool(
+    transport: str = "stdio",
+    host: str = "localhost",
+    port: int = 8002,
+    command: Optional[str] = None,
+    **kwargs: Any,
+) -> MCPClientPool:
+    """Return the shared pool for an MCP server, creating it on first use.
+
+    Each call takes a reference on the pool; pair it with ``release_pool``.
+    Extra keyword arguments (``timeout``, ``size``, ...) are part of the pool
+    key, so callers with different settings get separate pools rather than
+    silently inheriting the first caller's.
+    """
+    key = (transport, host, port, command, tuple(sorted(kwargs.items())))
+    pool = _POOLS.get(key)
+    if pool is None:
+        pool_kwargs = {k: kwargs.pop(k) for k in ("size", "keepalive_interval") if k in kwargs}
+        pool = MCPClientPool(
+            transport=transport,
+            host=host,
+            port=port,
+            command=command,
+            **pool_kwargs,
+            **kwargs,
+        )
+        _POOLS[key] = pool
+    pool._users += 1
+    return pool
+
+
+async def release_pool(pool: MCPClientPool) -> None:
+    """Drop a reference taken by ``get_pool``; the last one closes the pool."""
+    pool._users -= 1
+    if pool._users > 0:
+        return
+    for key, registered in list(_POOLS.items()):
+        if registered is pool:
+            del _POOLS[key]
+    await pool.close()
@@ -7,13 +7,14 @@ import logging
 import os
 import subprocess
 import sys
+import threading
+from collections import deque
 from pathlib import Path
 
-import uvicorn
 from dotenv import load_dotenv
 
-from egile_agent_core.models import OpenAI, XAI, Mistral
-from egile_agent_core.server import create_agent_os
+# uvicorn and egile_agent_core are imported where they're used, so
+# run_mcp_only() doesn't pay for the web stack and model clients
 
 from .plugin import XTwitterPlugin
 
@@ -26,12 +27,18 @@ logging.basicConfig(
     filename=log_file if log_file else None,
 )
 logger = logging.getLogger(__name__)
+mcp_logger = logging.getLogger(f"{__name__}.mcp_server")
 
 load_dotenv()
 
+MCP_STARTUP_TIMEOUT = 10.0
+
 
 def create_xtwitter_agent_os():
     """Create AgentOS with XTwitter plugin."""
+    from egile_agent_core.models import OpenAI, XAI, Mistral
+    from egile_agent_core.server import create_agent_os
+
     plugin = XTwitterPlugin(
         mcp_host=os.getenv("MCP_HOST", "localhost"),
         mcp_port=int(os.getenv("MCP_PORT", "8002")),
@@ -83,25 +90,70 @@ async def start_mcp_server():
     env = os.environ.copy()
     env.setdefault("PYTHONIOENCODING", "utf-8")
 
+    # stdout is unused; stderr carries the server's logs and must be drained
+    # continuously or the child blocks once the pipe buffer fills up
     process = subprocess.Popen(
         [sys.executable, "-m", mcp_module, "--transport", "sse", "--host", host, "--port", port],
-        stdout=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
         stderr=subprocess.PIPE,
         text=True,
+        errors="replace",
         env=env,
     )
-
-    await asyncio.sleep(2)
-
-    if process.poll() is not None:
-        stderr = process.stderr.read() if process.stderr else ""
-        logger.error("MCP server failed to start: %s", stderr)
+    stderr_tail: deque[str] = deque(maxlen=50)
+    drain = _drain_stderr(process, stderr_tail)
+
+    if not await _wait_until_listening(process, host, int(port)):
+        if process.poll() is not None:
+            await asyncio.to_thread(drain.join, 1.0)
+            logger.error("MCP server failed to start: %s", "\n".join(stderr_tail))
+        else:
+            logger.error("MCP server did not accept connections within %ss", MCP_STARTUP_TIMEOUT)
+            process.terminate()
         return None
 
     logger.info("MCP server started successfully on %s:%s", host, port)
     return process
 
 
+def _drain_stderr(process: subprocess.Popen, tail: deque[str]) -> threading.Thread:
+    """Forward the server's stderr to our log from a background thread.
+
+    A thread rather than an asyncio task: the process outlives the startup
+    event loop, since uvicorn.run() starts a loop of its own.
+    """
+
+    def run() -> None:
+        for line in process.stderr:
+            line = line.rstrip()
+            tail.append(line)
+            mcp_logger.info("%s", line)
+
+    thread = threading.Thread(target=run, name="mcp-server-stderr", daemon=True)
+    thread.start()
+    return thread
+
+
+async def _wait_until_listening(process: subprocess.Popen, host: str, port: int) -> bool:
+    """Poll the server's port until it accepts a TCP connection or the process exits."""
+    # A wildcard bind address isn't connectable everywhere (e.g. Windows)
+    probe_host = {"0.0.0.0": "127.0.0.1", "::": "::1", "": "127.0.0.1"}.get(host, host)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + MCP_STARTUP_TIMEOUT
+    while loop.time() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            _, writer = await asyncio.open_connection(probe_host, port)
+        except OSError:
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        await writer.wait_closed()
+        return True
+    return False
+
+
 def start_agent_ui_instructions():
     """Log instructions to start the Agent UI."""
     ui_path = Path(__file__).parent.parent.parent / "agent-ui"
@@ -115,12 +167,14 @@ def start_agent_ui_instructions():
         logger.info("cd /path/to/agent-ui")
         logger.info("pnpm dev")
     logger.info("\nThen open: http://localhost:3000")
-    logger.info(f"Connect to: http://localhost:{os.getenv('AGENTOS_PORT', '8000')}")
+    logger.info("Connect to: http://localhost:%s", os.getenv("AGENTOS_PORT", "8000"))
     logger.info("=" * 60 + "\n")
 
 
 def run_all():
     """Run MCP server + AgentOS."""
+    import uvicorn
+
     logger.info("Starting XTwitter Agent System...")
     mcp_process = None
     try:
@@ -137,8 +191,8 @@ def run_all():
         app = agent_os.get_app()
 
         logger.info("System Ready")
-        logger.info(f"MCP Server:   http://localhost:{os.getenv('MCP_PORT', '8002')}")
-        logger.info(f"AgentOS API:  http://localhost:{os.getenv('AGENTOS_PORT', '8000')}")
+        logger.info("MCP Server:   http://localhost:%s", os.getenv("MCP_PORT", "8002"))
+        logger.info("AgentOS API:  http://localhost:%s", os.getenv("AGENTOS_PORT", "8000"))
         logger.info("Agent UI:     http://localhost:3000 (start separately)")
 
         uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("AGENTOS_PORT", "8000")), log_level="info")
@@ -153,6 +207,8 @@ def run_all():
 
 def run_agent_only():
     """Run only the AgentOS server (assumes MCP is running)."""
+    import uvicorn
+
     logger.info("Starting AgentOS on port 8000 (MCP must be running on 8002)...")
     agent_os = create_xtwitter_agent_os()
     app = agent_os.get_app()
@@ -163,7 +219,7 @@ def run_mcp_only():
     """Run only the MCP server."""
     from egile_mcp_x_post_creator import server
 
-    logger.info(f"Starting MCP server on port {os.getenv('MCP_PORT', '8002')}...")
+    logger.info("Starting MCP server on port %s...", os.getenv("MCP_PORT", "8002"))
     server.mcp.run()
 
 
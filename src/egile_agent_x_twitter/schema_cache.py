@@ -0,0 +1,56 @@
+"""On-disk cache of MCP server tool definitions."""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from . import _json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path("~/.cache/egile/xtwitter_tools.json").expanduser()
+
+
+def cache_key(transport: str, host: str, port: int, command: Optional[str] = None) -> str:
+    """Identify an MCP server the same way the client pool does."""
+    if transport == "stdio":
+        return f"stdio:{command}"
+    return f"{transport}:{host}:{port}"
+
+
+def _read(path: Path) -> dict[str, Any]:
+    try:
+        data = _json.loads(path.read_bytes())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable tool schema cache %s: %s", path, e)
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_entry(path: Path, key: str, max_age: float) -> Optional[dict[str, Any]]:
+    """Return the cached entry for ``key`` if it is younger than ``max_age`` seconds."""
+    entry = _read(path).get(key)
+    if not isinstance(entry, dict):
+        return None
+    if time.time() - entry.get("saved_at", 0) > max_age:
+        return None
+    return entry
+
+
+def save_entry(path: Path, key: str, server_version: Optional[str], tools: list[dict[str, Any]]) -> None:
+    """Store the tool list for ``key``, keeping entries for other servers."""
+    data = _read(path)
+    data[key] = {"server_version": server_version, "saved_at": time.time(), "tools": tools}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(_json.dumps(data))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not write tool schema cache %s: %s", path, e)
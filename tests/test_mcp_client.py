@@ -0,0 +1,236 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import anyio
+import pytest
+from mcp.types import CallToolResult, ListToolsResult, TextContent, Tool
+
+from egile_agent_x_twitter import mcp_client, schema_cache
+from egile_agent_x_twitter.mcp_client import MCPClient
+from egile_agent_x_twitter.pool import MCPClientPool
+
+
+class FakeSession:
+    def __init__(self, is_error=False):
+        self.calls = []
+        self.is_error = is_error
+
+    async def call_tool(self, name, arguments=None, progress_callback=None):
+        self.calls.append((name, arguments))
+        return CallToolResult(
+            content=[TextContent(type="text", text=f"{name} #{len(self.calls)}")],
+            isError=self.is_error,
+        )
+
+
+def connected_client(session, **kwargs):
+    client = MCPClient(transport="sse", **kwargs)
+    client._session = session
+    client._tools_fetched_at = time.monotonic()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_results_are_not_cached_by_default():
+    session = FakeSession()
+    client = connected_client(session)
+    assert await client.call_tool("create_post", {"text": "hi"}) == "create_post #1"
+    assert await client.call_tool("create_post", {"text": "hi"}) == "create_post #2"
+
+
+@pytest.mark.asyncio
+async def test_cached_result_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(mcp_client, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    session = FakeSession()
+    client = connected_client(session, cache_ttl=60.0)
+    client._tools_fetched_at = now[0]
+
+    assert await client.call_tool("create_post", {"text": "hi"}) == "create_post #1"
+    now[0] += 59
+    assert await client.call_tool("create_post", {"text": "hi"}) == "create_post #1"
+    now[0] += 2
+    assert await client.call_tool("create_post", {"text": "hi"}) == "create_post #2"
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used():
+    session = FakeSession()
+    client = connected_client(session, cache_ttl=60.0, cache_size=2)
+
+    await client.call_tool("create_post", {"text": "a"})
+    await client.call_tool("create_post", {"text": "b"})
+    await client.call_tool("create_post", {"text": "a"})  # hit; "b" is now oldest
+    await client.call_tool("create_post", {"text": "c"})
+    assert len(session.calls) == 3
+
+    await client.call_tool("create_post", {"text": "a"})
+    assert len(session.calls) == 3
+    await client.call_tool("create_post", {"text": "b"})
+    assert len(session.calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_error_results_and_side_effects_are_not_cached():
+    session = FakeSession(is_error=True)
+    client = connected_client(session, cache_ttl=60.0)
+    await client.call_tool("create_post", {"text": "hi"})
+    await client.call_tool("create_post", {"text": "hi"})
+    assert len(session.calls) == 2
+
+    session.is_error = False
+    await client.publish_post("hi", confirm=True)
+    await client.publish_post("hi", confirm=True)
+    assert len(session.calls) == 4
+
+
+class ListingSession(FakeSession):
+    def __init__(self, tools):
+        super().__init__()
+        self.tools = tools
+        self.listed = 0
+        self._tool_output_schemas = {}
+
+    async def list_tools(self, cursor=None):
+        self.listed += 1
+        return ListToolsResult(tools=self.tools)
+
+
+def schema_client(tmp_path, session):
+    client = MCPClient(transport="sse", schema_cache_path=tmp_path / "tools.json")
+    client._session = session
+    return client
+
+
+@pytest.mark.asyncio
+async def test_tool_list_round_trips_through_schema_cache(tmp_path):
+    tool = Tool(name="create_post", inputSchema={"type": "object"}, outputSchema={"type": "object"})
+    first = ListingSession([tool])
+    await schema_client(tmp_path, first)._load_tools("1.0")
+    assert first.listed == 1
+
+    second = ListingSession([])
+    client = schema_client(tmp_path, second)
+    await client._load_tools("1.0")
+    assert second.listed == 0
+    assert client.get_tool("create_post") == tool
+    assert second._tool_output_schemas == {"create_post": {"type": "object"}}
+
+
+@pytest.mark.asyncio
+async def test_server_version_change_refreshes_schema_cache(tmp_path):
+    path = tmp_path / "tools.json"
+    schema_cache.save_entry(path, schema_cache.cache_key("sse", "localhost", 8002), "1.0", [])
+
+    session = ListingSession([Tool(name="publish_post", inputSchema={"type": "object"})])
+    client = schema_client(tmp_path, session)
+    await client._load_tools("2.0")
+    assert session.listed == 1
+    assert client.has_tool("publish_post")
+    assert schema_cache.load_entry(path, client.schema_cache_key, 60)["server_version"] == "2.0"
+
+
+def test_schema_cache_entry_expires(tmp_path):
+    path = tmp_path / "tools.json"
+    schema_cache.save_entry(path, "sse:localhost:8002", "1.0", [])
+    assert schema_cache.load_entry(path, "sse:localhost:8002", 60) is not None
+    assert schema_cache.load_entry(path, "sse:localhost:8002", -1) is None
+    assert schema_cache.load_entry(path, "sse:other:8002", 60) is None
+
+
+class ProgressSession(FakeSession):
+    async def call_tool(self, name, arguments=None, progress_callback=None):
+        await progress_callback(0.5, 1.0, "drafting")
+        await progress_callback(0.9, 1.0, None)
+        await progress_callback(1.0, 1.0, "polishing")
+        return await super().call_tool(name, arguments)
+
+
+@pytest.mark.asyncio
+async def test_call_tool_stream_yields_progress_then_result():
+    client = connected_client(ProgressSession())
+    chunks = [chunk async for chunk in client.call_tool_stream("create_post", {"text": "hi"})]
+    assert chunks == ["drafting", "polishing", "create_post #1"]
+
+
+@pytest.mark.asyncio
+async def test_call_tool_stream_raises_timeout():
+    class HangingSession(FakeSession):
+        async def call_tool(self, name, arguments=None, progress_callback=None):
+            await asyncio.sleep(1)
+
+    client = connected_client(HangingSession(), timeout=0.01)
+    with pytest.raises(TimeoutError):
+        async for _ in client.call_tool_stream("create_post", {"text": "hi"}):
+            pass
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Stand in for the SDK transport, including its anyio task group."""
+    sessions = []
+
+    async def open_session(self, stack):
+        await stack.enter_async_context(anyio.create_task_group())
+        session = ListingSession([])
+        sessions.append(session)
+        return session, SimpleNamespace(serverInfo=SimpleNamespace(version="1.0"))
+
+    monkeypatch.setattr(MCPClient, "_open_session", open_session)
+    return sessions
+
+
+@pytest.mark.asyncio
+async def test_session_can_be_closed_from_another_task(opened):
+    client = MCPClient(transport="sse")
+    await asyncio.create_task(client.connect())
+    assert client.connected
+
+    await client.close()
+    assert not client.connected
+
+    await client.connect()
+    await asyncio.create_task(client.close())
+    assert not client.connected
+    assert len(opened) == 2
+
+
+@pytest.mark.asyncio
+async def test_keepalive_closes_broken_session_and_next_call_reconnects(opened, monkeypatch):
+    async def ping(self):
+        raise ConnectionError("server went away")
+
+    monkeypatch.setattr(MCPClient, "ping", ping)
+    pool = MCPClientPool(transport="sse", keepalive_interval=0.01)
+    client = await asyncio.create_task(pool.acquire())
+    for _ in range(100):
+        if not client.connected:
+            break
+        await asyncio.sleep(0.01)
+    assert not client.connected
+
+    assert await client.call_tool("create_post", {"text": "hi"}) == "create_post #1"
+    assert len(opened) == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_connects_open_one_session(opened):
+    client = MCPClient(transport="sse")
+    await asyncio.gather(*(client.connect() for _ in range(3)))
+    assert len(opened) == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_create_post_stream_ends_with_structured_draft():
+    class StructuredSession(ProgressSession):
+        async def call_tool(self, name, arguments=None, progress_callback=None):
+            result = await super().call_tool(name, arguments, progress_callback)
+            result.structuredContent = {"post_text": "Hello X"}
+            return result
+
+    client = connected_client(StructuredSession())
+    chunks = [chunk async for chunk in client.create_post_stream("hi")]
+    assert chunks == ["drafting", "polishing", {"rendered": "create_post #1", "post_text": "Hello X"}]
@@ -1,5 +1,13 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import anyio
 import pytest
-from egile_agent_x_twitter import XTwitterPlugin
+from mcp.types import CallToolResult, TextContent
+from egile_agent_x_twitter import XTwitterPlugin, schema_cache
+from egile_agent_x_twitter import pool as pool_module
+from egile_agent_x_twitter.mcp_client import MCPClient
 
 
 @pytest.mark.asyncio
@@ -23,6 +31,20 @@ async def test_create_post_invokes_client(monkeypatch):
     assert result == "ok"
 
 
+@pytest.mark.asyncio
+async def test_create_post_uses_structured_post_text():
+    plugin = XTwitterPlugin()
+
+    class DummyClient:
+        async def create_post(self, **kwargs):
+            return {"rendered": "rendered output", "post_text": "Hello X"}
+
+    plugin._client = DummyClient()
+    result = await plugin.create_post(text="hello")
+    assert result == "rendered output"
+    assert plugin._last_draft_text == "Hello X"
+
+
 @pytest.mark.asyncio
 async def test_publish_requires_client(monkeypatch):
     plugin = XTwitterPlugin()
@@ -56,3 +78,302 @@ async def test_get_last_draft_returns_cached(monkeypatch):
     plugin = XTwitterPlugin()
     plugin._last_draft_text = "draft text"
     assert await plugin.get_last_draft() == "draft text"
+
+
+@pytest.mark.asyncio
+async def test_create_and_publish_uses_compound_tool():
+    plugin = XTwitterPlugin()
+    calls = []
+
+    class DummyClient:
+        def has_tool(self, name):
+            return name == "create_and_publish_post"
+
+        async def create_and_publish_post(self, **kwargs):
+            calls.append(kwargs)
+            return "published"
+
+    plugin._client = DummyClient()
+    result = await plugin.create_and_publish_post(text="hello", confirm=True)
+    assert result == "published"
+    assert calls and calls[0]["confirm"] is True
+
+
+@pytest.mark.asyncio
+async def test_create_and_publish_falls_back_to_draft_then_publish():
+    plugin = XTwitterPlugin()
+    published = []
+
+    class DummyClient:
+        def has_tool(self, name):
+            return False
+
+        async def create_post(self, **kwargs):
+            return {"rendered": "Draft ready: Hello X", "post_text": "Hello X"}
+
+        async def publish_post(self, **kwargs):
+            published.append(kwargs)
+            return "published"
+
+    plugin._client = DummyClient()
+    result = await plugin.create_and_publish_post(text="hello", confirm=True)
+    assert result == "published"
+    assert published == [{"post_text": "Hello X", "confirm": True}]
+
+
+def test_extract_post_text_handles_both_layouts():
+    rule = "-" * 60
+    rendered = f"✅ Post Created Successfully!\n\n📝 POST TEXT:\n{rule}\nHello X\n{rule}\n\nstats"
+    assert XTwitterPlugin._extract_post_text(rendered) == "Hello X"
+
+    # Mismatched rule lengths and extra whitespace go through the regex
+    assert XTwitterPlugin._extract_post_text("POST TEXT:  \n---\nHello\n-----\n") == "Hello"
+    assert XTwitterPlugin._extract_post_text("no draft here") is None
+
+
+def test_direct_post_drops_hashtags_that_do_not_fit():
+    plugin = XTwitterPlugin()
+    result = plugin._create_post_direct("wonderful " * 20, "casual", True, 50)
+    post = XTwitterPlugin._extract_post_text(result)
+    assert len(post) == 50
+    assert post.endswith("...")
+    assert "#" not in post
+
+    short = XTwitterPlugin._extract_post_text(plugin._create_post_direct("wonderful day", "casual", True, 280))
+    assert short.endswith("#Wonderful")
+
+    # "👋 hello wonderful amazing" plus "\n\n#Hello #Wonderful" is exactly 44 chars
+    for max_length in (44, 45, 46):
+        post = XTwitterPlugin._extract_post_text(
+            plugin._create_post_direct("hello wonderful amazing", "casual", True, max_length)
+        )
+        assert post == "👋 hello wonderful amazing\n\n#Hello #Wonderful"
+    post = XTwitterPlugin._extract_post_text(
+        plugin._create_post_direct("hello wonderful amazing", "casual", True, 43)
+    )
+    assert post == "👋 hello wonderful amazing"
+
+
+def test_get_tools_json_matches_get_tools():
+    plugin = XTwitterPlugin()
+    assert json.loads(plugin.get_tools_json()) == plugin.get_tools()
+
+
+def test_compound_publish_is_not_an_llm_tool():
+    plugin = XTwitterPlugin()
+    names = [tool["function"]["name"] for tool in plugin.get_tools()]
+    assert "create_and_publish_post" not in names
+    assert "create_and_publish_post" not in plugin.get_tool_functions()
+
+
+@pytest.fixture
+def connects(monkeypatch):
+    """Count MCPClient.connect calls without opening a real session."""
+    calls = []
+
+    async def connect(self):
+        calls.append(self)
+        self._session = object()
+
+    async def create_post(self, **kwargs):
+        return {"rendered": "rendered", "post_text": kwargs["text"]}
+
+    monkeypatch.setattr(MCPClient, "connect", connect)
+    monkeypatch.setattr(MCPClient, "create_post", create_post)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_fresh_schema_cache_defers_connect_to_first_tool_call(tmp_path, connects):
+    path = tmp_path / "tools.json"
+    plugin = XTwitterPlugin(mcp_transport="sse", mcp_port=18001, schema_cache_path=path)
+    key = schema_cache.cache_key("sse", "localhost", 18001, plugin.mcp_command)
+    schema_cache.save_entry(path, key, "1.0", [])
+
+    await plugin.on_agent_start(object())
+    assert connects == []
+    try:
+        await plugin.create_post(text="one")
+        await plugin.create_post(text="two")
+        assert len(connects) == 1
+        assert plugin._last_draft_text == "two"
+    finally:
+        await plugin.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_missing_schema_cache_connects_on_start(tmp_path, connects):
+    plugin = XTwitterPlugin(
+        mcp_transport="sse", mcp_port=18002, schema_cache_path=tmp_path / "tools.json"
+    )
+    await plugin.on_agent_start(object())
+    try:
+        assert len(connects) == 1
+    finally:
+        await plugin.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ensure_client_connects_once(tmp_path, monkeypatch):
+    calls = []
+
+    async def slow_connect(self):
+        calls.append(self)
+        await asyncio.sleep(0.01)
+        self._session = object()
+
+    monkeypatch.setattr(MCPClient, "connect", slow_connect)
+    plugin = XTwitterPlugin(
+        mcp_transport="sse", mcp_port=18003, schema_cache_path=tmp_path / "tools.json"
+    )
+    try:
+        clients = await asyncio.gather(*(plugin._ensure_client() for _ in range(5)))
+        assert len(calls) == 1
+        assert all(client is clients[0] for client in clients)
+    finally:
+        await plugin.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_create_posts_drafts_concurrently():
+    plugin = XTwitterPlugin()
+    started = []
+
+    class DummyClient:
+        async def create_post(self, **kwargs):
+            started.append(kwargs["text"])
+            await asyncio.sleep(0)
+            # Both drafts are in flight before either finishes
+            assert len(started) == 2
+            return {"rendered": f"draft {kwargs['text']}", "post_text": kwargs["text"]}
+
+    plugin._client = DummyClient()
+    result = await plugin.create_posts([{"text": "a"}, {"text": "b", "style": "witty"}])
+    assert result == ["draft a", "draft b"]
+    assert plugin._last_draft_text in ("a", "b")
+
+
+@pytest.mark.asyncio
+async def test_plugins_share_one_client_until_last_cleanup(tmp_path, connects, monkeypatch):
+    closed = []
+
+    async def close(self):
+        closed.append(self)
+
+    monkeypatch.setattr(MCPClient, "close", close)
+    p1, p2 = (
+        XTwitterPlugin(mcp_transport="sse", mcp_port=18010, schema_cache_path=tmp_path / "tools.json")
+        for _ in range(2)
+    )
+    await p1.on_agent_start(object())
+    await p2.on_agent_start(object())
+    assert len(connects) == 1
+    assert p1._client is p2._client
+    pool = p1._pool
+
+    await p1.cleanup()
+    assert closed == []
+    assert pool in pool_module._POOLS.values()
+
+    await p2.cleanup()
+    assert closed == connects
+    assert pool not in pool_module._POOLS.values()
+
+
+@pytest.mark.asyncio
+async def test_failed_connect_does_not_leak_pool_reference(tmp_path, monkeypatch):
+    attempts = []
+
+    async def flaky_connect(self):
+        attempts.append(self)
+        if len(attempts) == 1:
+            raise ConnectionError("server not up yet")
+        self._session = object()
+
+    monkeypatch.setattr(MCPClient, "connect", flaky_connect)
+    plugin = XTwitterPlugin(
+        mcp_transport="sse", mcp_port=18011, schema_cache_path=tmp_path / "tools.json"
+    )
+    with pytest.raises(ConnectionError):
+        await plugin.on_agent_start(object())
+
+    await plugin.on_agent_start(object())
+    pool = plugin._pool
+    assert pool._users == 1
+
+    await plugin.cleanup()
+    assert pool not in pool_module._POOLS.values()
+
+
+@pytest.mark.asyncio
+async def test_lazy_session_opened_in_one_task_closes_from_another(tmp_path, monkeypatch):
+    class Session:
+        async def call_tool(self, name, arguments=None, progress_callback=None):
+            return CallToolResult(
+                content=[TextContent(type="text", text="rendered")],
+                structuredContent={"post_text": arguments["text"]},
+            )
+
+    async def open_session(self, stack):
+        # The real transports enter an anyio task group bound to this task
+        await stack.enter_async_context(anyio.create_task_group())
+        return Session(), SimpleNamespace(serverInfo=SimpleNamespace(version="1.0"))
+
+    monkeypatch.setattr(MCPClient, "_open_session", open_session)
+    path = tmp_path / "tools.json"
+    plugin = XTwitterPlugin(mcp_transport="sse", mcp_port=18020, schema_cache_path=path)
+    key = schema_cache.cache_key("sse", "localhost", 18020, plugin.mcp_command)
+    schema_cache.save_entry(path, key, "1.0", [])
+
+    await plugin.on_agent_start(object())
+    assert await asyncio.create_task(plugin.create_post(text="hi")) == "rendered"
+    client, pool = plugin._client, plugin._pool
+    assert client.connected
+
+    await plugin.cleanup()
+    assert not client.connected
+    assert pool not in pool_module._POOLS.values()
+    assert plugin._pool is None and not plugin._ready.is_set()
+
+
+@pytest.mark.asyncio
+async def test_plugins_with_different_settings_get_separate_pools(tmp_path, connects):
+    p1, p2 = (
+        XTwitterPlugin(
+            mcp_transport="sse", mcp_port=18012, timeout=timeout, schema_cache_path=tmp_path / "tools.json"
+        )
+        for timeout in (5.0, 60.0)
+    )
+    await p1.on_agent_start(object())
+    await p2.on_agent_start(object())
+    try:
+        assert p1._pool is not p2._pool
+        assert (p1._client.timeout, p2._client.timeout) == (5.0, 60.0)
+    finally:
+        await p1.cleanup()
+        await p2.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_create_post_stream_caches_structured_post_text():
+    plugin = XTwitterPlugin()
+
+    class DummyClient:
+        async def create_post_stream(self, **kwargs):
+            yield "drafting"
+            yield {"rendered": "Draft ready: Hello X", "post_text": "Hello X"}
+
+    plugin._client = DummyClient()
+    chunks = [chunk async for chunk in plugin.create_post_stream(text="hello")]
+    assert chunks == ["drafting", "Draft ready: Hello X"]
+    assert plugin._last_draft_text == "Hello X"
+
+
+@pytest.mark.asyncio
+async def test_create_post_stream_direct_mode_matches_create_post():
+    plugin = XTwitterPlugin(use_mcp=False)
+    chunks = [chunk async for chunk in plugin.create_post_stream(text="wonderful day")]
+    streamed = plugin._last_draft_text
+    assert len(chunks) == 1
+    assert await plugin.create_post(text="wonderful day") == chunks[0]
+    assert plugin._last_draft_text == streamed
@@ -0,0 +1,34 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from egile_agent_x_twitter import XTwitterPlugin
+from egile_agent_x_twitter.mcp_client import MCPClient
+
+PUBLISHED = "✅ Post Published Successfully!\n\n🔗 URL: https://x.com/i/status/1"
+
+
+@pytest.mark.asyncio
+async def test_publish_returns_structured_response(monkeypatch, tmp_path):
+    async def connect(self):
+        pass
+
+    publish = AsyncMock(return_value=PUBLISHED)
+    monkeypatch.setattr(MCPClient, "connect", connect)
+    monkeypatch.setattr(MCPClient, "publish_post", publish)
+
+    # A fresh schema cache path keeps the plugin from connecting lazily
+    plugin = XTwitterPlugin(schema_cache_path=tmp_path / "tools.json")
+    await plugin.on_agent_start(object())
+    try:
+        response = await plugin.publish_post(
+            post_text="This is a test post to verify publish_post response.",
+            confirm=True,
+        )
+    finally:
+        await plugin.cleanup()
+
+    assert response == PUBLISHED
+    publish.assert_awaited_once_with(
+        post_text="This is a test post to verify publish_post response.",
+        confirm=True,
+    )